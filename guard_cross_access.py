@@ -17,50 +17,77 @@ import os
 import re
 import sys
 
+# Tool name -> tool_input field holding the path or command to check
+_GUARDED_FIELDS = {
+    "Bash": "command",
+    "Read": "file_path",
+    "Write": "file_path",
+    "Edit": "file_path",
+    "Glob": "path",
+    "Grep": "path",
+}
+
+# Quoted tool names for the cheap pre-parse scan of the raw hook payload
+_GUARDED_MARKERS = tuple(f'"{name}"'.encode() for name in _GUARDED_FIELDS)
+
+
+def _canonical(text):
+    """Lowercase and forward-slash text; the form all matching runs on."""
+    return text.lower().replace("\\", "/")
+
 
 def _normalize(path):
     """Lowercase and forward-slash normalize a path string."""
-    return path.replace("\\", "/").lower().rstrip("/")
+    return _canonical(path).rstrip("/")
 
 
 def _msys2_form(win_path):
     """Convert c:/users/... to /c/users/... (MSYS2 mount format)."""
-    m = re.match(r"^([a-z]):/(.*)$", win_path)
-    if m:
-        return "/" + m.group(1) + "/" + m.group(2)
+    # Plain character checks; a regex is overkill for "letter + ':/'"
+    if len(win_path) > 2 and win_path[1:3] == ":/" and "a" <= win_path[0] <= "z":
+        return f"/{win_path[0]}/{win_path[3:]}"
     return None
 
 
-def _is_path_match(text, prefix):
-    """Check if text contains prefix as a proper directory path.
+def _path_forms(path):
+    """Return the (forward-slash, MSYS2 or None) match forms of a dir."""
+    norm = _normalize(path)
+    return norm, _msys2_form(norm)
+
+
+# A forbidden path only counts as a proper directory match when followed by
+# a separator, quote, whitespace, or end-of-string. This prevents
+# c:/users/me/.claude from matching c:/users/me/.claude-business.
+_PATH_END = r"(?=[/\\ \t'\"]|\Z)"
+
+
+def _build_matcher(forbidden_list):
+    """Compile all forbidden path forms into a single alternation regex.
 
-    Matches 'prefix/' or 'prefix' at end-of-string, but NOT 'prefix-other'.
-    This prevents c:/users/me/.claude from matching c:/users/me/.claude-business.
+    forbidden_list holds (norm, msys, display) records. Returns
+    (pattern, owner) where owner maps each matched needle back to the
+    display form of its forbidden dir. The text is canonicalized to forward
+    slashes before matching, so the backslash form needs no needle of its
+    own.
     """
-    idx = text.find(prefix)
-    while idx != -1:
-        end = idx + len(prefix)
-        # Check what follows: must be /, \, end-of-string, or whitespace
-        if end >= len(text) or text[end] in ("/", "\\", " ", "\t", "'", '"'):
-            return True
-        idx = text.find(prefix, idx + 1)
-    return False
-
-
-def _contains_any_forbidden(text, forbidden_list):
-    """Check if text contains any forbidden path in any format."""
-    lowered = text.lower()
-    fwd = lowered.replace("\\", "/")
-    for norm, msys in forbidden_list:
-        # Forward-slash form
-        if _is_path_match(fwd, norm):
-            return norm
-        # Backslash form
-        if _is_path_match(lowered, norm.replace("/", "\\")):
-            return norm
-        # MSYS2 form
-        if msys and _is_path_match(lowered, msys):
-            return norm
+    owner = {}
+    for norm, msys, display in forbidden_list:
+        owner.setdefault(norm, display)
+        if msys:
+            owner.setdefault(msys, display)
+    alternation = "|".join(re.escape(n) for n in owner)
+    return re.compile(f"(?:{alternation}){_PATH_END}"), owner
+
+
+def _contains_any_forbidden(text, matcher):
+    """Return the display form of the first forbidden path in text, or None.
+
+    One regex pass over the text instead of one substring scan per needle.
+    """
+    pattern, owner = matcher
+    m = pattern.search(_canonical(text))
+    if m:
+        return owner[m.group(0)]
     return None
 
 
@@ -84,43 +111,35 @@ def main():
     if not raw_dirs:
         sys.exit(0)
 
-    # Pre-compute normalized + MSYS2 forms
-    forbidden_list = []
-    for d in raw_dirs:
-        norm = _normalize(d)
-        msys = _msys2_form(norm)
-        forbidden_list.append((norm, msys))
+    # Read raw bytes: json.loads decodes them itself, so skip the
+    # TextIOWrapper decode entirely (and for unguarded tools, any decode)
+    raw = sys.stdin.buffer.read()
+    # Skip the JSON parse entirely for tools the guard doesn't care about
+    if not any(marker in raw for marker in _GUARDED_MARKERS):
+        sys.exit(0)
 
     try:
-        input_data = json.load(sys.stdin)
+        input_data = json.loads(raw)
     except (json.JSONDecodeError, ValueError):
         sys.exit(0)
 
-    tool_name = input_data.get("tool_name", "")
-    tool_input = input_data.get("tool_input", {})
-
-    matched = None
+    field = _GUARDED_FIELDS.get(input_data.get("tool_name", ""))
+    if not field:
+        sys.exit(0)
 
-    if tool_name == "Bash":
-        command = tool_input.get("command", "")
-        if command:
-            matched = _contains_any_forbidden(command, forbidden_list)
+    value = input_data.get("tool_input", {}).get(field, "")
+    if not value:
+        sys.exit(0)
 
-    elif tool_name in ("Read", "Write", "Edit"):
-        file_path = tool_input.get("file_path", "")
-        if file_path:
-            matched = _contains_any_forbidden(file_path, forbidden_list)
+    # Pre-compute normalized + MSYS2 forms, each paired with the dir as
+    # originally given for the deny message
+    forbidden_list = [(*_path_forms(d), d) for d in raw_dirs]
 
-    elif tool_name in ("Glob", "Grep"):
-        path = tool_input.get("path", "")
-        if path:
-            matched = _contains_any_forbidden(path, forbidden_list)
+    matched = _contains_any_forbidden(value, _build_matcher(forbidden_list))
 
     if matched:
         account = os.environ.get("CLAUDE_ACCOUNT", "unknown")
         config_dir = os.environ.get("CLAUDE_CONFIG_DIR", "~/.claude")
-        # Reconstruct the original path for display
-        display_dir = matched.replace("/", "\\") if "\\" in raw_dirs[0] else matched
         result = {
             "hookSpecificOutput": {
                 "hookEventName": "PreToolUse",
@@ -129,7 +148,7 @@ def main():
                     f"Cross-account access denied. "
                     f"You are running as the '{account}' account "
                     f"(config: {config_dir}). "
-                    f"Access to {display_dir} is forbidden. "
+                    f"Access to {matched} is forbidden. "
                     f"That path belongs to a different account."
                 ),
             }
@@ -10,7 +10,6 @@ Configuration is read from ~/.claude-launcher.json.
 
 import json
 import os
-import platform
 import subprocess
 import sys
 from pathlib import Path
@@ -19,6 +18,8 @@ RESET = "\033[0m"
 BOLD = "\033[1m"
 DIM = "\033[2m"
 
+IS_WINDOWS = sys.platform == "win32"
+
 CHOICE_FILE = Path.home() / ".claude-account"
 CONFIG_FILE = Path.home() / ".claude-launcher.json"
 
@@ -28,12 +29,23 @@ WT_RESET = "\x1b]104;264\x07"
 
 # -- Color utilities --------------------------------------------------------
 
+_HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
+
+
 def hex_to_rgb(color):
     """Parse '#RRGGBB' or 'RRGGBB' -> (r, g, b)."""
     color = color.lstrip("#")
-    if len(color) != 6:
+    # int(..., 16) alone would also accept "0x", "+", "_" and whitespace
+    if len(color) != 6 or not _HEX_DIGITS.issuperset(color):
         raise ValueError(f"Invalid hex color: {color}")
-    return int(color[0:2], 16), int(color[2:4], 16), int(color[4:6], 16)
+    v = int(color, 16)
+    return (v >> 16) & 0xFF, (v >> 8) & 0xFF, v & 0xFF
+
+
+# Per-channel lookup tables for rgb_to_ansi256: 6x6x6 cube level, and
+# grayscale ramp index (clamped; only used for 8 <= value <= 248)
+_CUBE_IDX = bytes(round(i / 255 * 5) for i in range(256))
+_GRAY_IDX = bytes(232 + round((min(max(i, 8), 248) - 8) / 247 * 24) for i in range(256))
 
 
 def rgb_to_ansi256(r, g, b):
@@ -44,13 +56,10 @@ def rgb_to_ansi256(r, g, b):
             return 16
         if r > 248:
             return 231
-        return round((r - 8) / 247 * 24) + 232
+        return _GRAY_IDX[r]
 
     # Map to the 6x6x6 color cube (indices 16-231)
-    ri = round(r / 255 * 5)
-    gi = round(g / 255 * 5)
-    bi = round(b / 255 * 5)
-    return 16 + 36 * ri + 6 * gi + bi
+    return 16 + 36 * _CUBE_IDX[r] + 6 * _CUBE_IDX[g] + _CUBE_IDX[b]
 
 
 def ansi_fg(color_index):
@@ -67,7 +76,7 @@ def wt_tab_sequence(r, g, b):
 
 def default_claude_exe():
     """Return the default claude binary path for this platform."""
-    if platform.system() == "Windows":
+    if IS_WINDOWS:
         return str(Path.home() / ".local" / "bin" / "claude.exe")
     return str(Path.home() / ".local" / "bin" / "claude")
 
@@ -88,8 +97,43 @@ def default_config():
     }
 
 
+def cache_account_fields(acct):
+    """Precompute derived per-account values used at render and launch time.
+
+    Caches the absolute config dir, the dirs other accounts must be
+    forbidden from, the menu ANSI color and the WT tab sequence under
+    underscore keys, which save_config never writes to disk.
+    """
+    acct["_config_dir"] = resolve_config_dir(acct)
+    d = acct.get("config_dir")
+    if d:
+        written = os.path.abspath(os.path.expanduser(d))
+    else:
+        written = str(Path.home() / ".claude")
+    # The guard matches strings, so a symlinked dir has to be forbidden
+    # both as written and as its target
+    real = acct["_config_dir"] or os.path.realpath(written)
+    acct["_guard_dirs"] = (written,) if real == written else (written, real)
+    try:
+        r, g, b = hex_to_rgb(acct["color"])
+    except (ValueError, KeyError):
+        acct["_ansi_fg"] = ""
+        acct["_wt_tab"] = ""
+        return
+    acct["_ansi_fg"] = ansi_fg(rgb_to_ansi256(r, g, b))
+    acct["_wt_tab"] = wt_tab_sequence(r, g, b)
+
+
 def load_config():
-    """Load and validate ~/.claude-launcher.json, with fallbacks."""
+    """Load ~/.claude-launcher.json and precompute per-account fields."""
+    cfg = _read_config()
+    for acct in cfg["accounts"]:
+        cache_account_fields(acct)
+    return cfg
+
+
+def _read_config():
+    """Read and validate ~/.claude-launcher.json, with fallbacks."""
     if not CONFIG_FILE.exists():
         return default_config()
 
@@ -122,38 +166,45 @@ def resolve_config_dir(acct):
     """Return the resolved config dir path, or None for the default account."""
     d = acct.get("config_dir")
     if d:
-        return str(Path(d).resolve())
+        return os.path.realpath(os.path.expanduser(d))
     return None
 
 
+def index_accounts(accounts):
+    """Map account id -> index, keeping the first account for duplicate ids."""
+    idx_by_id = {}
+    for i, acct in enumerate(accounts):
+        idx_by_id.setdefault(acct["id"], i)
+    return idx_by_id
+
+
 def compute_forbidden_dirs(accounts, current_index):
     """Compute the forbidden dirs for account at current_index.
 
-    Returns a list of resolved config dir paths for all OTHER accounts.
+    Returns a list of absolute config dir paths for all OTHER accounts.
     For accounts with config_dir=None (default), use ~/.claude as the path.
+    A dir that is a symlink is listed both as written and as its target.
     """
     forbidden = []
-    default_dir = str(Path.home() / ".claude")
     for i, acct in enumerate(accounts):
         if i == current_index:
             continue
-        d = resolve_config_dir(acct)
-        if d:
-            forbidden.append(d)
-        else:
-            forbidden.append(default_dir)
+        for d in acct["_guard_dirs"]:
+            if d not in forbidden:
+                forbidden.append(d)
     return forbidden
 
 
 # -- TUI menu --------------------------------------------------------------
 
-def read_last_choice(accounts):
+def read_last_choice(accounts, idx_by_id):
     """Read the last account choice from disk."""
     try:
-        text = CHOICE_FILE.read_text(encoding="utf-8").strip().lower()
-        for acct in accounts:
-            if acct["id"] == text:
-                return text
+        # The file only ever holds one short account id; bound the read
+        with open(CHOICE_FILE, "rb") as f:
+            text = f.read(64).decode("utf-8", errors="replace").strip().lower()
+        if text in idx_by_id:
+            return text
     except OSError:
         pass
     return accounts[0]["id"]
@@ -167,11 +218,26 @@ def save_choice(choice):
         pass
 
 
-def show_menu(accounts, default_id):
+def show_menu(cfg, default_id):
     """Display the account picker on stderr and return the chosen account id."""
-    if platform.system() == "Windows":
-        return _menu_windows(accounts, default_id)
-    return _menu_unix(accounts, default_id)
+    accounts = cfg["accounts"]
+    key_map, id_to_label = _menu_maps(cfg)
+    if IS_WINDOWS:
+        return _menu_windows(accounts, default_id, key_map, id_to_label)
+    return _menu_unix(accounts, default_id, key_map, id_to_label)
+
+
+def _menu_maps(cfg):
+    """Return (key_map, id_to_label), built once and cached on cfg.
+
+    config_menu drops the cache when it returns, since accounts may have
+    been added, removed or edited.
+    """
+    if "_key_map" not in cfg:
+        accounts = cfg["accounts"]
+        cfg["_key_map"] = _build_key_map(accounts)
+        cfg["_id_to_label"] = {a["id"]: a["label"] for a in accounts}
+    return cfg["_key_map"], cfg["_id_to_label"]
 
 
 def _build_key_map(accounts):
@@ -189,24 +255,18 @@ def _build_key_map(accounts):
 
 
 def _render_menu(accounts, default_id):
-    """Render the menu text to stderr."""
-    stderr = sys.stderr
-    stderr.write(f"\n{BOLD}Claude Code -- Select Account{RESET}\n")
+    """Render the menu text to stderr in a single write."""
+    parts = [f"\n{BOLD}Claude Code -- Select Account{RESET}\n"]
 
     for i, acct in enumerate(accounts):
-        try:
-            r, g, b = hex_to_rgb(acct["color"])
-            color = ansi_fg(rgb_to_ansi256(r, g, b))
-        except (ValueError, KeyError):
-            color = ""
-
+        color = acct["_ansi_fg"]
         marker = f" {DIM}(default){RESET}" if acct["id"] == default_id else ""
         num = i + 1
         hk = acct.get("hotkey", "")
         key_hint = f"{num}"
         if hk:
             key_hint = f"{num}/{hk}"
-        stderr.write(f"  {color}[{key_hint}]{RESET} {acct['label']}{marker}\n")
+        parts.append(f"  {color}[{key_hint}]{RESET} {acct['label']}{marker}\n")
 
     # Build prompt hint
     keys = []
@@ -217,17 +277,16 @@ def _render_menu(accounts, default_id):
     hint = "/".join(keys)
     if hotkeys:
         hint += " or " + "/".join(hotkeys)
-    stderr.write(f"  {DIM}[c]{RESET} Configure accounts...\n")
-    stderr.write(f"\n{DIM}Press {hint}, Enter=default, c=config, q=quit{RESET} > ")
-    stderr.flush()
+    parts.append(f"  {DIM}[c]{RESET} Configure accounts...\n")
+    parts.append(f"\n{DIM}Press {hint}, Enter=default, c=config, q=quit{RESET} > ")
+    sys.stderr.write("".join(parts))
+    sys.stderr.flush()
 
 
-def _menu_windows(accounts, default_id):
+def _menu_windows(accounts, default_id, key_map, id_to_label):
     """Windows menu using msvcrt."""
     import msvcrt
 
-    key_map = _build_key_map(accounts)
-    id_to_label = {a["id"]: a["label"] for a in accounts}
     _render_menu(accounts, default_id)
 
     while True:
@@ -252,13 +311,11 @@ def _menu_windows(accounts, default_id):
             sys.exit(1)
 
 
-def _menu_unix(accounts, default_id):
+def _menu_unix(accounts, default_id, key_map, id_to_label):
     """Unix menu using tty/termios."""
     import termios
     import tty
 
-    key_map = _build_key_map(accounts)
-    id_to_label = {a["id"]: a["label"] for a in accounts}
     _render_menu(accounts, default_id)
 
     fd = sys.stdin.fileno()
@@ -298,17 +355,32 @@ def _input(prompt, default=None):
         prompt = f"{prompt}: "
     sys.stderr.write(prompt)
     sys.stderr.flush()
-    val = input().strip()
+    # readline() returns "" on EOF instead of raising like input()
+    val = sys.stdin.readline().strip()
     return val if val else default
 
 
 def save_config(cfg):
     """Write config back to ~/.claude-launcher.json."""
+    # Leave out launcher-internal (underscore) keys such as cached colors
+    on_disk = {k: v for k, v in cfg.items() if not k.startswith("_")}
+    on_disk["accounts"] = [
+        {k: v for k, v in acct.items() if not k.startswith("_")}
+        for acct in cfg["accounts"]
+    ]
     with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-        json.dump(cfg, f, indent=2)
+        json.dump(on_disk, f, indent=2)
     sys.stderr.write(f"Saved {CONFIG_FILE}\n")
 
 
+def _account_lines(accounts):
+    """Return the numbered account list used by remove/edit as one string."""
+    return "".join(
+        f"  [{i + 1}] {acct['label']} ({acct['id']})\n"
+        for i, acct in enumerate(accounts)
+    )
+
+
 def config_add_account(cfg):
     """Add a new account interactively."""
     sys.stderr.write(f"\n{BOLD}Add Account{RESET}\n")
@@ -332,13 +404,15 @@ def config_add_account(cfg):
     config_dir = _input("  Config directory", default=default_dir)
     hotkey = _input("  Hotkey letter", default=acct_id[0])
 
-    cfg["accounts"].append({
+    acct = {
         "id": acct_id,
         "label": label,
         "color": color,
         "config_dir": config_dir,
         "hotkey": hotkey[0] if hotkey else acct_id[0],
-    })
+    }
+    cache_account_fields(acct)
+    cfg["accounts"].append(acct)
     save_config(cfg)
     sys.stderr.write(f"  Added account '{acct_id}'.\n")
 
@@ -350,9 +424,7 @@ def config_remove_account(cfg):
         sys.stderr.write("  Cannot remove the last account.\n")
         return
 
-    sys.stderr.write(f"\n{BOLD}Remove Account{RESET}\n")
-    for i, acct in enumerate(accounts):
-        sys.stderr.write(f"  [{i + 1}] {acct['label']} ({acct['id']})\n")
+    sys.stderr.write(f"\n{BOLD}Remove Account{RESET}\n" + _account_lines(accounts))
     choice = _input("  Account number to remove")
     if not choice or not choice.isdigit():
         sys.stderr.write("  Cancelled.\n")
@@ -373,9 +445,7 @@ def config_edit_account(cfg):
     """Edit an existing account interactively."""
     accounts = cfg["accounts"]
 
-    sys.stderr.write(f"\n{BOLD}Edit Account{RESET}\n")
-    for i, acct in enumerate(accounts):
-        sys.stderr.write(f"  [{i + 1}] {acct['label']} ({acct['id']})\n")
+    sys.stderr.write(f"\n{BOLD}Edit Account{RESET}\n" + _account_lines(accounts))
     choice = _input("  Account number to edit")
     if not choice or not choice.isdigit():
         sys.stderr.write("  Cancelled.\n")
@@ -393,6 +463,7 @@ def config_edit_account(cfg):
     if acct["config_dir"] is not None:
         acct["config_dir"] = _input("  Config dir", default=acct["config_dir"])
     acct["hotkey"] = _input("  Hotkey", default=acct.get("hotkey", acct["id"][0]))
+    cache_account_fields(acct)
     save_config(cfg)
     sys.stderr.write(f"  Updated account '{acct['id']}'.\n")
 
@@ -400,16 +471,18 @@ def config_edit_account(cfg):
 def config_menu(cfg):
     """Show the config management submenu."""
     while True:
-        sys.stderr.write(f"\n{BOLD}Configure Accounts{RESET}\n")
-        sys.stderr.write(f"  [a] Add account\n")
-        sys.stderr.write(f"  [r] Remove account\n")
-        sys.stderr.write(f"  [e] Edit account\n")
-        sys.stderr.write(f"  [l] List accounts\n")
-        sys.stderr.write(f"  [q] Back to launcher\n")
-        sys.stderr.write(f"\n{DIM}Choice{RESET} > ")
+        sys.stderr.write(
+            f"\n{BOLD}Configure Accounts{RESET}\n"
+            "  [a] Add account\n"
+            "  [r] Remove account\n"
+            "  [e] Edit account\n"
+            "  [l] List accounts\n"
+            "  [q] Back to launcher\n"
+            f"\n{DIM}Choice{RESET} > "
+        )
         sys.stderr.flush()
 
-        if platform.system() == "Windows":
+        if IS_WINDOWS:
             import msvcrt
             ch = msvcrt.getch()
             if ch in (b"\x00", b"\xe0"):
@@ -429,35 +502,31 @@ def config_menu(cfg):
             sys.stderr.write("Edit\n")
             config_edit_account(cfg)
         elif c == "l":
-            sys.stderr.write("List\n")
-            sys.stderr.write(f"\n{BOLD}Current Accounts{RESET}\n")
+            parts = [f"List\n\n{BOLD}Current Accounts{RESET}\n"]
             for i, acct in enumerate(cfg["accounts"]):
                 d = acct["config_dir"] or "~/.claude (default)"
-                try:
-                    r, g, b = hex_to_rgb(acct["color"])
-                    color = ansi_fg(rgb_to_ansi256(r, g, b))
-                except (ValueError, KeyError):
-                    color = ""
-                sys.stderr.write(
-                    f"  {color}[{i + 1}]{RESET} {acct['label']} "
+                parts.append(
+                    f"  {acct['_ansi_fg']}[{i + 1}]{RESET} {acct['label']} "
                     f"(id={acct['id']}, color={acct['color']}, "
                     f"hotkey={acct.get('hotkey', '?')}, dir={d})\n"
                 )
+            sys.stderr.write("".join(parts))
         elif c in ("q", "\x1b"):
             sys.stderr.write("Back\n")
             break
 
+    # Accounts may have changed; rebuild the picker key map on next use
+    cfg.pop("_key_map", None)
+    cfg.pop("_id_to_label", None)
+
 
 # -- Launch -----------------------------------------------------------------
 
 def set_tab_color(acct):
     """Emit Windows Terminal tab color escape sequence."""
-    try:
-        r, g, b = hex_to_rgb(acct["color"])
-        sys.stdout.write(wt_tab_sequence(r, g, b))
+    if acct["_wt_tab"]:
+        sys.stdout.write(acct["_wt_tab"])
         sys.stdout.flush()
-    except (ValueError, KeyError):
-        pass
 
 
 def reset_tab_color():
@@ -468,33 +537,43 @@ def reset_tab_color():
 
 def launch(cfg, acct, acct_index, extra_args):
     """Set env vars and launch the claude binary."""
-    env = os.environ.copy()
-
-    env["CLAUDE_ACCOUNT"] = acct["id"]
+    overrides = {"CLAUDE_ACCOUNT": acct["id"]}
+    unset = []
 
     # Compute and set forbidden dirs (all other accounts' config dirs)
     forbidden = compute_forbidden_dirs(cfg["accounts"], acct_index)
     if forbidden:
-        env["CLAUDE_ACCOUNT_FORBIDDEN_DIRS"] = ",".join(forbidden)
+        overrides["CLAUDE_ACCOUNT_FORBIDDEN_DIRS"] = ",".join(forbidden)
+        # Also set singular form for backward compat
+        overrides["CLAUDE_ACCOUNT_FORBIDDEN_DIR"] = forbidden[0]
     else:
-        env.pop("CLAUDE_ACCOUNT_FORBIDDEN_DIRS", None)
-
-    # Also set singular form for backward compat
-    if forbidden:
-        env["CLAUDE_ACCOUNT_FORBIDDEN_DIR"] = forbidden[0]
+        unset.append("CLAUDE_ACCOUNT_FORBIDDEN_DIRS")
 
-    config_dir = resolve_config_dir(acct)
+    config_dir = acct["_config_dir"]
     if config_dir:
-        env["CLAUDE_CONFIG_DIR"] = config_dir
+        overrides["CLAUDE_CONFIG_DIR"] = config_dir
     else:
-        env.pop("CLAUDE_CONFIG_DIR", None)
+        unset.append("CLAUDE_CONFIG_DIR")
 
+    # Build the child env in one pass instead of copy() then per-key updates
+    env = {**os.environ, **overrides}
+    for key in unset:
+        env.pop(key, None)
+
+    argv = [cfg["claude_exe"]] + extra_args
     set_tab_color(acct)
+
+    # With no tab color set there is nothing to reset once claude exits,
+    # so on POSIX replace this process instead of waiting on a child.
+    # WT_SESSION can't tell us whether the terminal is Windows Terminal: it
+    # is not forwarded over SSH, sudo or into containers.
+    if not IS_WINDOWS and not acct["_wt_tab"]:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.execvpe(argv[0], argv, env)
+
     try:
-        result = subprocess.run(
-            [cfg["claude_exe"]] + extra_args,
-            env=env,
-        )
+        result = subprocess.run(argv, env=env)
         return result.returncode
     finally:
         reset_tab_color()
@@ -505,14 +584,14 @@ def launch(cfg, acct, acct_index, extra_args):
 def main():
     cfg = load_config()
     accounts = cfg["accounts"]
+    idx_by_id = index_accounts(accounts)
 
     # If CLAUDE_ACCOUNT is already set, skip the picker (re-entry guard)
     existing = os.environ.get("CLAUDE_ACCOUNT", "").lower()
-    if existing:
-        for i, acct in enumerate(accounts):
-            if acct["id"] == existing:
-                rc = launch(cfg, acct, i, sys.argv[1:])
-                sys.exit(rc)
+    i = idx_by_id.get(existing) if existing else None
+    if i is not None:
+        rc = launch(cfg, accounts[i], i, sys.argv[1:])
+        sys.exit(rc)
 
     # Single account -- skip picker
     if len(accounts) == 1:
@@ -520,14 +599,15 @@ def main():
         sys.exit(rc)
 
     while True:
-        default_id = read_last_choice(accounts)
-        choice = show_menu(accounts, default_id)
+        default_id = read_last_choice(accounts, idx_by_id)
+        choice = show_menu(cfg, default_id)
 
         if choice == "__configure__":
+            # config_menu edits cfg in place and saves it, so there is
+            # nothing to reload from disk
             config_menu(cfg)
-            # Reload config in case accounts were added/removed/edited
-            cfg = load_config()
             accounts = cfg["accounts"]
+            idx_by_id = index_accounts(accounts)
             if len(accounts) == 1:
                 choice = accounts[0]["id"]
                 break
@@ -537,10 +617,10 @@ def main():
 
     save_choice(choice)
 
-    for i, acct in enumerate(accounts):
-        if acct["id"] == choice:
-            rc = launch(cfg, acct, i, sys.argv[1:])
-            sys.exit(rc)
+    i = idx_by_id.get(choice)
+    if i is not None:
+        rc = launch(cfg, accounts[i], i, sys.argv[1:])
+        sys.exit(rc)
 
     # Should not reach here
     print("Error: chosen account not found", file=sys.stderr)
@@ -4,7 +4,7 @@
 Walks the user through configuring multiple Claude accounts:
 1. Asks for account names, labels, colors, config dirs
 2. Writes ~/.claude-launcher.json
-3. Creates config dirs for non-default accounts
+3. Creates config and hooks dirs for each account
 4. Copies hooks from the default account (if they exist)
 5. Writes settings.json with guard hook for each non-default account
 6. Copies wrappers to ~/bin/
@@ -15,17 +15,87 @@ Walks the user through configuring multiple Claude accounts:
 
 import json
 import os
-import platform
-import shutil
 import sys
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 SCRIPT_DIR = Path(__file__).resolve().parent
 HOME = Path.home()
+IS_WINDOWS = sys.platform == "win32"
 CONFIG_FILE = HOME / ".claude-launcher.json"
 DEFAULT_COLORS = ["#cc3333", "#2ecc71", "#3498db", "#e67e22", "#9b59b6",
                   "#1abc9c", "#e74c3c", "#f39c12", "#2980b9"]
 
+# Substring identifying the guard hook's command in settings.json
+GUARD_MARKER = "guard_cross_access"
+
+# Markers delimiting the generated isolation section in CLAUDE.md
+ISOLATION_START = "<!-- account-isolation:start -->"
+ISOLATION_END = "<!-- account-isolation:end -->"
+ISOLATION_HEADING = "\n## Account Isolation\n"
+
+
+def read_json(path):
+    """Parse a JSON file, using orjson when it is installed.
+
+    The file is read as bytes, which both parsers accept directly, so no
+    text decoding layer is involved. orjson.JSONDecodeError subclasses
+    json.JSONDecodeError, so callers can catch the stdlib exception either
+    way.
+    """
+    data = path.read_bytes()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def write_json(path, obj):
+    """Write obj to path as JSON indented by 2 spaces.
+
+    The document is serialized in memory, written to a sibling temp file
+    in one call and renamed over path, so a crash never leaves it
+    half-written. Symlinks are followed first, so a symlinked file (e.g.
+    from a dotfile manager) is updated at its target rather than replaced,
+    and an existing file keeps its permission bits.
+    """
+    if orjson is not None:
+        data = orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(obj, indent=2).encode("utf-8")
+    path = path.resolve()
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        tmp.write_bytes(data)
+        try:
+            os.chmod(tmp, path.stat().st_mode & 0o7777)
+        except FileNotFoundError:
+            pass
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def read_line(prompt):
+    """Read one line of input after printing prompt.
+
+    Uses input() (with line editing) on a terminal and a plain
+    sys.stdin.readline() for piped input. Raises EOFError at end of input
+    either way.
+    """
+    if sys.stdin.isatty():
+        return input(prompt)
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+    line = sys.stdin.readline()
+    if not line:
+        raise EOFError
+    return line.rstrip("\r\n")
+
 
 def ask(prompt, default=None):
     """Prompt user for input with an optional default."""
@@ -33,14 +103,14 @@ def ask(prompt, default=None):
         prompt = f"{prompt} [{default}]: "
     else:
         prompt = f"{prompt}: "
-    val = input(prompt).strip()
+    val = read_line(prompt).strip()
     return val if val else default
 
 
 def ask_yn(prompt, default=True):
     """Ask a yes/no question."""
     hint = "Y/n" if default else "y/N"
-    val = input(f"{prompt} [{hint}]: ").strip().lower()
+    val = read_line(f"{prompt} [{hint}]: ").strip().lower()
     if not val:
         return default
     return val in ("y", "yes")
@@ -48,7 +118,20 @@ def ask_yn(prompt, default=True):
 
 def find_claude_exe():
     """Try to locate the claude binary."""
-    if platform.system() == "Windows":
+    import shutil
+
+    # Search PATH first, skipping ~/bin: that is where our own wrapper is
+    # installed, and pointing the launcher at it would make it recurse
+    wrapper_dir = normalize_path(str(HOME / "bin"))
+    search_path = os.pathsep.join(
+        p for p in os.environ.get("PATH", "").split(os.pathsep)
+        if normalize_path(p) != wrapper_dir
+    )
+    hit = shutil.which("claude.exe" if IS_WINDOWS else "claude", path=search_path)
+    if hit:
+        return hit
+
+    if IS_WINDOWS:
         candidates = [
             HOME / ".local" / "bin" / "claude.exe",
             HOME / "AppData" / "Local" / "Programs" / "claude" / "claude.exe",
@@ -117,125 +200,213 @@ def write_config(claude_exe, accounts):
         "claude_exe": claude_exe,
         "accounts": accounts,
     }
-    with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-        json.dump(cfg, f, indent=2)
+    write_json(CONFIG_FILE, cfg)
     print(f"\nWrote {CONFIG_FILE}")
 
 
-def create_config_dirs(accounts):
-    """Create config directories for non-default accounts."""
+def build_deploy_plan(accounts):
+    """Precompute every path the deploy steps touch, once per account.
+
+    Returns one dict per account (in account order) holding the account
+    itself and its config dir, hooks dir, settings.json and CLAUDE.md paths.
+    """
+    default_claude = HOME / ".claude"
+    plan = []
     for acct in accounts:
-        if acct["config_dir"]:
-            d = Path(acct["config_dir"])
-            if not d.exists():
-                d.mkdir(parents=True)
-                print(f"Created {d}")
-            # Create hooks subdir
-            hooks_dir = d / "hooks"
-            if not hooks_dir.exists():
-                hooks_dir.mkdir(parents=True)
-                print(f"Created {hooks_dir}")
-
-
-def copy_guard_hook(accounts):
+        d = Path(acct["config_dir"]) if acct["config_dir"] else default_claude
+        plan.append({
+            "acct": acct,
+            "dir": d,
+            "hooks": d / "hooks",
+            "settings": d / "settings.json",
+            "claude_md": d / "CLAUDE.md",
+        })
+    return plan
+
+
+def install_file(src, dst):
+    """Copy src to dst with metadata, skipping the copy if dst is current.
+
+    copy2 preserves mtime, so a dst with the same size and whole-second
+    mtime as src is taken to be an earlier copy of it. Returns the status
+    line to print.
+    """
+    try:
+        s = src.stat()
+        d = dst.stat()
+        current = s.st_size == d.st_size and int(s.st_mtime) == int(d.st_mtime)
+    except FileNotFoundError:
+        current = False
+
+    if current:
+        return f"Up to date {dst}"
+    # Deferred: shutil pulls in compression modules at import time,
+    # which the prompt-and-abort paths never need
+    import shutil
+    shutil.copy2(src, dst)
+    return f"Installed {dst}"
+
+
+def run_per_account(step, items, target):
+    """Run step over items on a small thread pool, printing results in order.
+
+    The per-account deploy steps are file I/O, so running them concurrently
+    overlaps filesystem latency (noticeable on network home dirs). Accounts
+    may share a config dir, so items are grouped by target(item), the file
+    the step writes, and each group runs in order on a single worker; no two
+    threads ever touch the same file. step returns the line to print;
+    printing stays on this thread and in item order, so output is the same
+    as a sequential run.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    items = list(items)
+    groups = {}
+    for i, item in enumerate(items):
+        # resolve() so "~/.claude", "~/.claude/" and symlinked aliases of
+        # the same file land in one group
+        groups.setdefault(target(item).resolve(), []).append(i)
+
+    lines = [None] * len(items)
+
+    def run_group(indices):
+        for i in indices:
+            lines[i] = step(items[i])
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(8, len(groups)))) as ex:
+            # list() re-raises any exception from a worker here
+            list(ex.map(run_group, groups.values()))
+    finally:
+        # On failure, still report the steps that did complete
+        for line in lines:
+            if line is not None:
+                print(line)
+
+
+def create_config_dirs(plan):
+    """Create every account's config and hooks dir in one pass.
+
+    Runs before any file is installed, so later steps can assume the dirs
+    exist. Each unique dir is created once; mkdir itself reports whether it
+    already existed, so no exists() probe is needed.
+    """
+    dirs = dict.fromkeys(d for entry in plan for d in (entry["dir"], entry["hooks"]))
+    for new_dir in dirs:
+        try:
+            new_dir.mkdir(parents=True)
+        except FileExistsError:
+            continue
+        print(f"Created {new_dir}")
+
+
+def copy_guard_hook(plan):
     """Copy guard_cross_access.py to each account's hooks dir."""
     src = SCRIPT_DIR / "guard_cross_access.py"
     if not src.exists():
         print(f"Warning: {src} not found, skipping hook installation")
         return
 
-    for acct in accounts:
-        if acct["config_dir"]:
-            dst = Path(acct["config_dir"]) / "hooks" / "guard_cross_access.py"
-        else:
-            dst = HOME / ".claude" / "hooks" / "guard_cross_access.py"
-        dst.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(src, dst)
-        print(f"Installed {dst}")
+    targets = [entry["hooks"] / "guard_cross_access.py" for entry in plan]
+    run_per_account(lambda dst: install_file(src, dst), targets,
+                    target=lambda dst: dst)
 
 
-def write_settings_json(accounts):
+def write_settings_json(plan):
     """Write or update settings.json with the guard hook for each account."""
     hook_entry = {
         "type": "command",
         "command": "python hooks/guard_cross_access.py",
     }
 
-    for acct in accounts:
-        if acct["config_dir"]:
-            settings_path = Path(acct["config_dir"]) / "settings.json"
-        else:
-            settings_path = HOME / ".claude" / "settings.json"
+    def update_one(entry):
+        settings_path = entry["settings"]
 
-        # Load existing settings or start fresh
-        settings = {}
-        if settings_path.exists():
-            try:
-                with open(settings_path, encoding="utf-8") as f:
-                    settings = json.load(f)
-            except (json.JSONDecodeError, OSError):
-                pass
+        # Load existing settings or start fresh (a missing file is an OSError).
+        # Only write the file back if something actually changed.
+        dirty = False
+        try:
+            settings = read_json(settings_path)
+        except (json.JSONDecodeError, OSError):
+            settings = {}
+            dirty = True
 
         # Ensure hooks.PreToolUse contains the guard
         hooks = settings.setdefault("hooks", {})
         pre_tool = hooks.setdefault("PreToolUse", [])
 
         # Check if guard hook already exists
-        already = any("guard_cross_access" in (h.get("command", ""))
-                       for h in pre_tool if isinstance(h, dict))
+        already = False
+        for h in pre_tool:
+            if isinstance(h, dict) and GUARD_MARKER in (h.get("command") or ""):
+                already = True
+                break
         if not already:
             pre_tool.append(hook_entry)
+            dirty = True
 
-        with open(settings_path, "w", encoding="utf-8") as f:
-            json.dump(settings, f, indent=2)
-        print(f"Updated {settings_path}")
+        if not dirty:
+            return f"Up to date {settings_path}"
+        write_json(settings_path, settings)
+        return f"Updated {settings_path}"
 
+    run_per_account(update_one, plan, target=lambda entry: entry["settings"])
 
-def write_claude_md_isolation(accounts):
+
+def write_claude_md_isolation(plan):
     """Append account isolation section to each account's CLAUDE.md."""
-    for idx, acct in enumerate(accounts):
-        if acct["config_dir"]:
-            claude_md = Path(acct["config_dir"]) / "CLAUDE.md"
-        else:
-            claude_md = HOME / ".claude" / "CLAUDE.md"
+    default_dir = str(HOME / ".claude")
+    all_dirs = [entry["acct"]["config_dir"] or default_dir for entry in plan]
 
-        # Build forbidden list
-        other_dirs = []
-        default_dir = str(HOME / ".claude")
-        for i, other in enumerate(accounts):
-            if i == idx:
-                continue
-            d = other["config_dir"] if other["config_dir"] else default_dir
-            other_dirs.append(d)
+    def update_one(item):
+        idx, entry = item
+        acct = entry["acct"]
+        claude_md = entry["claude_md"]
 
+        # Forbidden list: every other account's dir
+        other_dirs = all_dirs[:idx] + all_dirs[idx + 1:]
+
+        forbidden = "".join(f"NEVER access files under {d}.\n" for d in other_dirs)
         isolation_section = (
-            f"\n## Account Isolation\n"
+            f"{ISOLATION_START}"
+            f"{ISOLATION_HEADING}"
             f"This is the {acct['label'].upper()} account. "
             f"Config: {acct['config_dir'] or default_dir}\n"
+            f"{forbidden}"
+            f"{ISOLATION_END}"
         )
-        for d in other_dirs:
-            isolation_section += f"NEVER access files under {d}.\n"
 
         # Check if CLAUDE.md already has an isolation section
-        existing = ""
-        if claude_md.exists():
+        try:
             existing = claude_md.read_text(encoding="utf-8")
-
-        if "## Account Isolation" in existing:
-            # Replace existing section
-            import re
-            existing = re.sub(
-                r"\n## Account Isolation\n.*?(?=\n## |\Z)",
-                isolation_section,
-                existing,
-                flags=re.DOTALL,
-            )
+        except FileNotFoundError:
+            existing = ""
+
+        start = existing.find(ISOLATION_START)
+        end = existing.find(ISOLATION_END, start) if start != -1 else -1
+        if end != -1:
+            # Replace the marked section
+            end += len(ISOLATION_END)
+            existing = existing[:start] + isolation_section + existing[end:]
+            claude_md.write_text(existing, encoding="utf-8")
+        elif ISOLATION_HEADING in existing:
+            # Unmarked section from an older setup: replace it up to the
+            # next heading, adding the markers for future runs
+            start = existing.find(ISOLATION_HEADING)
+            end = existing.find("\n## ", start + len(ISOLATION_HEADING))
+            if end == -1:
+                end = len(existing)
+            existing = (existing[:start] + "\n" + isolation_section + "\n"
+                        + existing[end:])
             claude_md.write_text(existing, encoding="utf-8")
         else:
             with open(claude_md, "a", encoding="utf-8") as f:
-                f.write(isolation_section)
+                f.write("\n" + isolation_section + "\n")
+
+        return f"Updated {claude_md}"
 
-        print(f"Updated {claude_md}")
+    run_per_account(update_one, enumerate(plan),
+                    target=lambda item: item[1]["claude_md"])
 
 
 def copy_launcher(accounts):
@@ -246,8 +417,7 @@ def copy_launcher(accounts):
         return
 
     dst = HOME / ".claude" / "launcher.py"
-    shutil.copy2(src, dst)
-    print(f"Installed {dst}")
+    print(install_file(src, dst))
 
 
 def copy_wrappers():
@@ -264,10 +434,14 @@ def copy_wrappers():
         src = wrapper_dir / name
         if src.exists():
             dst = bin_dir / name
-            shutil.copy2(src, dst)
-            if platform.system() != "Windows":
+            print(install_file(src, dst))
+            if not IS_WINDOWS:
                 os.chmod(dst, 0o755)
-            print(f"Installed {dst}")
+
+
+def normalize_path(p):
+    """Lowercase, forward-slash and strip trailing slashes for comparison."""
+    return p.replace("\\", "/").lower().rstrip("/")
 
 
 def check_path():
@@ -275,21 +449,22 @@ def check_path():
     bin_dir = str(HOME / "bin")
     local_bin = str(HOME / ".local" / "bin")
     path = os.environ.get("PATH", "")
-    path_dirs = path.split(os.pathsep)
 
-    # Normalize for comparison
-    norm_dirs = [p.replace("\\", "/").lower().rstrip("/") for p in path_dirs]
-    norm_bin = bin_dir.replace("\\", "/").lower().rstrip("/")
-    norm_local = local_bin.replace("\\", "/").lower().rstrip("/")
+    # Normalized dir -> position of its first occurrence in PATH
+    norm_index = {}
+    for i, p in enumerate(path.split(os.pathsep)):
+        norm_index.setdefault(normalize_path(p), i)
+    norm_bin = normalize_path(bin_dir)
+    norm_local = normalize_path(local_bin)
 
-    if norm_bin not in norm_dirs:
+    bin_idx = norm_index.get(norm_bin)
+    if bin_idx is None:
         print(f"\nWARNING: {bin_dir} is not in your PATH.")
         print("Add it to your PATH ahead of ~/.local/bin for the wrappers to work.")
         return
 
-    bin_idx = norm_dirs.index(norm_bin)
-    if norm_local in norm_dirs:
-        local_idx = norm_dirs.index(norm_local)
+    local_idx = norm_index.get(norm_local)
+    if local_idx is not None:
         if bin_idx > local_idx:
             print(f"\nWARNING: {bin_dir} appears AFTER ~/.local/bin in PATH.")
             print("Move it earlier so the wrapper takes precedence over the real binary.")
@@ -304,18 +479,18 @@ def load_existing_config():
     if not CONFIG_FILE.exists():
         return None
     try:
-        with open(CONFIG_FILE, encoding="utf-8") as f:
-            return json.load(f)
+        return read_json(CONFIG_FILE)
     except (json.JSONDecodeError, OSError):
         return None
 
 
 def deploy_files(accounts):
     """Deploy all files to their local locations (shared by setup and update)."""
-    create_config_dirs(accounts)
-    copy_guard_hook(accounts)
-    write_settings_json(accounts)
-    write_claude_md_isolation(accounts)
+    plan = build_deploy_plan(accounts)
+    create_config_dirs(plan)
+    copy_guard_hook(plan)
+    write_settings_json(plan)
+    write_claude_md_isolation(plan)
     copy_launcher(accounts)
     copy_wrappers()
     check_path()